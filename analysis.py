@@ -5,6 +5,7 @@ import json
 import os
 import re
 from typing import Dict, List, Tuple, Optional
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib
@@ -14,11 +15,35 @@ import io
 import base64
 import pdfplumber
 import docx
+
+# 可选的更快的PDF解析后端
+try:
+    import pymupdf
+except ImportError:
+    pymupdf = None
+
+try:
+    import pypdfium2 as pdfium
+    import pypdfium2.raw as pdfium_c
+except ImportError:
+    pdfium = None
+    pdfium_c = None
 from datetime import datetime
 import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
 import uuid
+import abc
+import argparse
+import hashlib
+import math
+import multiprocessing
+import multiprocessing.connection
+import signal
+import sqlite3
+import sys
+import threading
+import time
 
 # 配置DeepSeek API
 DEEPSEEK_API_URL = "https://api.deepseek.com/v1/chat/completions"
@@ -30,27 +55,587 @@ MAX_ABSTRACT_LENGTH = 500  # 摘要最大长度
 MAX_TOKENS = 2000  # 最大token数
 TEMPERATURE = 0.3  # 温度参数
 
+# API录制/回放配置（用于离线回归测试和压测）
+CASSETTE_MODE = os.environ.get("DEEPSEEK_CASSETTE_MODE", "")  # ""（关闭）、"record" 或 "replay"
+CASSETTE_PATH = os.environ.get("DEEPSEEK_CASSETTE_PATH", "deepseek_cassette.jsonl")  # 录制文件
+CASSETTE_REPLAY_LATENCY = os.environ.get("DEEPSEEK_CASSETTE_LATENCY", "0") == "1"  # 回放时是否模拟原始延迟
+
+# PDF解析配置
+PDF_BACKEND = os.environ.get("PAPER_AGENT_PDF_BACKEND", "auto")  # auto、pymupdf、pypdfium2 或 pdfplumber
+PDF_MAX_PAGES = int(os.environ.get("PAPER_AGENT_PDF_PAGES", "2"))  # 只解析前N页（标题、作者、摘要），0表示全部页面
+
+# 共享存储配置（多进程部署时各进程共用）
+SHARED_DB_PATH = os.environ.get("PAPER_AGENT_DB", "paper_agent.db")  # SQLite数据库文件
+CACHE_ENABLED = os.environ.get("PAPER_AGENT_CACHE", "1") == "1"  # 是否启用文本和分析结果缓存
+
+# 服务配置
+SERVER_NAME = "127.0.0.1"
+SERVER_PORT = 7863
+
+# 语料库评分配置
+LEADERBOARD_SIZE = 20  # 排行榜显示条数
+QUALITY_METRICS = ['创新性', '完整性', '可行性', '影响力', '实用性', '关键词新颖度']
+
+
+def _as_list(value) -> List:
+    """将分析结果中的字段统一为列表"""
+    if isinstance(value, list):
+        return value
+    if isinstance(value, str) and value.strip():
+        return [value]
+    return []
+
+
+def _count_items(analyses: List[Dict], key: str) -> np.ndarray:
+    """统计每篇文献某一字段的条目数"""
+    return np.fromiter(
+        (len(_as_list(analysis.get(key))) for analysis in analyses),
+        dtype=np.float64,
+        count=len(analyses)
+    )
+
+
+def _keyword_novelty(analyses: List[Dict]) -> np.ndarray:
+    """计算关键词新颖度：关键词在语料库其他文献中未出现的比例（0-100）"""
+    n = len(analyses)
+    vocabulary = {}
+    rows, cols = [], []
+    for i, analysis in enumerate(analyses):
+        keywords = {str(k).strip().lower() for k in _as_list(analysis.get("keywords"))} - {""}
+        for keyword in keywords:
+            rows.append(i)
+            cols.append(vocabulary.setdefault(keyword, len(vocabulary)))
+
+    if not cols:
+        return np.zeros(n)
+
+    rows = np.asarray(rows)
+    cols = np.asarray(cols)
+
+    # 每个关键词的文献频次（稀疏计数，避免构造 文献×关键词 的稠密矩阵）
+    doc_freq = np.bincount(cols, minlength=len(vocabulary))
+    if n > 1:
+        share = 1.0 - (doc_freq[cols] - 1) / (n - 1)
+    else:
+        share = np.ones(len(cols))
+
+    totals = np.bincount(rows, weights=share, minlength=n)
+    counts = np.bincount(rows, minlength=n)
+    return np.divide(totals * 100, counts, out=np.zeros(n), where=counts > 0)
+
+
+def score_analyses(analyses: List[Dict]) -> pd.DataFrame:
+    """批量计算文献质量评分及其在语料库中的百分位排名"""
+    innovations = _count_items(analyses, "innovations")
+    limitations = _count_items(analyses, "limitations")
+    improvements = _count_items(analyses, "improvements")
+
+    innovation_score = np.minimum(innovations * 20, 100)
+    limitation_score = np.maximum(100 - limitations * 15, 20)
+    improvement_score = np.minimum(improvements * 25, 100)
+
+    scores = pd.DataFrame({
+        '创新性': innovation_score,
+        '完整性': np.maximum(70, limitation_score),
+        '可行性': improvement_score,
+        '影响力': innovation_score * 0.7 + improvement_score * 0.3,
+        '实用性': improvement_score * 0.8 + innovation_score * 0.2,
+        '关键词新颖度': _keyword_novelty(analyses),
+    })
+    scores['综合得分'] = scores[QUALITY_METRICS].to_numpy().mean(axis=1)
+
+    # 百分位排名（0-100）
+    percentiles = scores.rank(pct=True) * 100
+    percentiles.columns = [f"{column}百分位" for column in percentiles.columns]
+
+    titles = [
+        str((analysis.get("basic_info") or {}).get("title", "未知"))
+        if isinstance(analysis.get("basic_info"), dict) else "未知"
+        for analysis in analyses
+    ]
+    scores.insert(0, '标题', titles)
+
+    return pd.concat([scores, percentiles], axis=1)
+
+
+def build_leaderboard(scores: pd.DataFrame, top_n: int = LEADERBOARD_SIZE) -> pd.DataFrame:
+    """根据评分表生成语料库排行榜"""
+    columns = ['标题', '综合得分', '综合得分百分位', '创新性', '关键词新颖度']
+    leaderboard = scores.nlargest(top_n, '综合得分')[columns].round(1)
+    leaderboard.insert(0, '排名', range(1, len(leaderboard) + 1))
+    return leaderboard.reset_index(drop=True)
+
+
+class SharedStore:
+    """多进程共享的本地存储（SQLite WAL模式），保存缓存和历史分析结果"""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS cache (
+        namespace TEXT NOT NULL,
+        key TEXT NOT NULL,
+        value TEXT NOT NULL,
+        PRIMARY KEY (namespace, key)
+    );
+    CREATE TABLE IF NOT EXISTS corpus (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        key TEXT NOT NULL UNIQUE,
+        seq INTEGER NOT NULL,
+        record TEXT NOT NULL
+    );
+    CREATE UNIQUE INDEX IF NOT EXISTS corpus_seq ON corpus(seq);
+    """
+
+    def __init__(self, path: str = SHARED_DB_PATH, cache_enabled: bool = CACHE_ENABLED):
+        self.path = path
+        self.cache_enabled = cache_enabled
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        """获取当前线程的数据库连接（fork后的子进程重新连接）"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(self.SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get_cache(self, namespace: str, key: str) -> Optional[str]:
+        """读取缓存"""
+        if not self.cache_enabled:
+            return None
+        row = self._connect().execute(
+            "SELECT value FROM cache WHERE namespace = ? AND key = ?", (namespace, key)
+        ).fetchone()
+        return row[0] if row else None
+
+    def set_cache(self, namespace: str, key: str, value: str):
+        """写入缓存"""
+        if not self.cache_enabled:
+            return
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value) VALUES (?, ?, ?)",
+                (namespace, key, value)
+            )
+
+    def upsert_analysis(self, key: str, record: Dict) -> int:
+        """按内容哈希写入分析结果（已存在则更新），返回记录ID"""
+        conn = self._connect()
+        with conn:
+            # seq 为全局写入序号，其他进程据此增量同步新增和更新的记录
+            conn.execute(
+                """INSERT INTO corpus (key, seq, record)
+                VALUES (?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM corpus), ?)
+                ON CONFLICT(key) DO UPDATE SET seq = excluded.seq, record = excluded.record
+                WHERE corpus.record != excluded.record""",
+                (key, json.dumps(record, ensure_ascii=False))
+            )
+            row = conn.execute("SELECT id FROM corpus WHERE key = ?", (key,)).fetchone()
+        return row[0]
+
+    def load_analyses(self, after_seq: int = 0) -> List[Tuple[int, int, Dict]]:
+        """读取写入序号大于 after_seq 的分析结果，返回（记录ID, 序号, 记录）"""
+        rows = self._connect().execute(
+            "SELECT id, seq, record FROM corpus WHERE seq > ? ORDER BY seq", (after_seq,)
+        ).fetchall()
+        return [(row_id, seq, json.loads(record)) for row_id, seq, record in rows]
+
+
+shared_store = SharedStore()
+
+
+class AnalysisStore:
+    """历史分析结果语料库，增量同步共享存储并缓存评分表"""
+
+    STORED_FIELDS = ("basic_info", "innovations", "limitations", "improvements", "fields", "keywords")
+
+    def __init__(self, store: Optional[SharedStore] = None):
+        self.store = store if store is not None else shared_store
+        self._positions: Dict[int, int] = {}  # 记录ID -> 语料库索引
+        self._analyses: List[Dict] = []
+        self._last_seq = 0
+        self._scores: Optional[pd.DataFrame] = None
+        self._lock = threading.Lock()
+
+    def _sync(self):
+        """同步其他进程新增或更新的分析结果"""
+        rows = self.store.load_analyses(self._last_seq)
+        for row_id, seq, record in rows:
+            if row_id in self._positions:
+                self._analyses[self._positions[row_id]] = record
+            else:
+                self._positions[row_id] = len(self._analyses)
+                self._analyses.append(record)
+            self._last_seq = seq
+        if rows:
+            self._scores = None
+
+    def load(self) -> List[Dict]:
+        """读取全部历史分析结果"""
+        with self._lock:
+            self._sync()
+            return list(self._analyses)
+
+    def add(self, key: str, analysis_result: Dict) -> int:
+        """写入一条分析结果（相同内容哈希只保留一条），返回其在语料库中的索引"""
+        record = {field: analysis_result.get(field) for field in self.STORED_FIELDS}
+        row_id = self.store.upsert_analysis(key, record)
+        with self._lock:
+            self._sync()
+            return self._positions[row_id]
+
+    def scores(self) -> pd.DataFrame:
+        """获取语料库评分表"""
+        with self._lock:
+            self._sync()
+            if self._scores is None:
+                self._scores = score_analyses(self._analyses)
+            return self._scores
+
+
+analysis_store = AnalysisStore()
+
+
+class CassetteResponse:
+    """回放的API响应，接口与 requests.Response 的常用部分一致"""
+
+    def __init__(self, status_code: int, text: str):
+        self.status_code = status_code
+        self.text = text
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class ApiCassette:
+    """DeepSeek API 请求录制与回放"""
+
+    def __init__(self, path: str = CASSETTE_PATH, mode: str = CASSETTE_MODE,
+                 replay_latency: bool = CASSETTE_REPLAY_LATENCY):
+        if mode not in ("", "record", "replay"):
+            raise ValueError(f"不支持的录制模式: {mode}")
+        self.path = path
+        self.mode = mode
+        self.replay_latency = replay_latency
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict[str, List[Dict]]] = None
+        self._cursors: Dict[str, int] = {}
+
+    @staticmethod
+    def fingerprint(payload: Dict) -> str:
+        """计算请求指纹（不包含API密钥等请求头）"""
+        canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+
+    def _load(self) -> Dict[str, List[Dict]]:
+        """读取录制文件，按请求指纹分组"""
+        if self._entries is None:
+            self._entries = {}
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        line = line.strip()
+                        if not line:
+                            continue
+                        try:
+                            entry = json.loads(line)
+                        except json.JSONDecodeError:
+                            continue
+                        self._entries.setdefault(entry["fp"], []).append(entry)
+        return self._entries
+
+    def record(self, payload: Dict, status_code: int, text: str, elapsed: float):
+        """录制一次请求的响应和耗时"""
+        entry = {
+            "fp": self.fingerprint(payload),
+            "status": status_code,
+            "body": text,
+            "elapsed": round(elapsed, 3)
+        }
+        with self._lock:
+            # 先读取已有录制，避免新写入的条目在内存中重复
+            entries = self._load()
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + "\n")
+            entries.setdefault(entry["fp"], []).append(entry)
+
+    def replay(self, payload: Dict) -> CassetteResponse:
+        """回放录制的响应；同一请求录制多次时按录制顺序循环返回"""
+        fp = self.fingerprint(payload)
+        with self._lock:
+            entries = self._load().get(fp)
+            if not entries:
+                raise Exception(f"录制文件中未找到该请求 (指纹: {fp})")
+            cursor = self._cursors.get(fp, 0)
+            self._cursors[fp] = cursor + 1
+            entry = entries[cursor % len(entries)]
+
+        if self.replay_latency:
+            time.sleep(entry.get("elapsed", 0))
+
+        return CassetteResponse(entry["status"], entry["body"])
+
+
+api_cassette = ApiCassette()
+
+
+# 不可能是标题的首页文本（arXiv编号、DOI、网址、期刊页眉、版权声明、页码等）
+NON_TITLE_PATTERN = re.compile(
+    r"arxiv:\s*\d{4}\.\d{4,5}|\bdoi\b|https?://|www\.|preprint|proceedings|journal of|"
+    r"\bvol\.|©|copyright|^\d+$",
+    re.IGNORECASE
+)
+ABSTRACT_HEADING_PATTERN = re.compile(r"(摘\s*要|abstract|summary)", re.IGNORECASE)
+PAGE_MARGIN = 0.08  # 页面左右边距比例，完全位于边距内的文本行（如arXiv侧边戳）不参与版面识别
+MAX_AUTHOR_LINES = 3
+
+
+def in_page_margin(x0: float, x1: float, page_width: float) -> bool:
+    """文本行是否完全位于页面左右边距内"""
+    return x1 < page_width * PAGE_MARGIN or x0 > page_width * (1 - PAGE_MARGIN)
+
+
+def detect_title_block(lines: List[Tuple[float, str]]) -> Dict[str, str]:
+    """根据首页文本行的字号识别标题和作者"""
+    lines = [
+        (size, text.strip()) for size, text in lines
+        if text.strip() and not NON_TITLE_PATTERN.search(text.strip())
+    ]
+    if not lines:
+        return {}
+
+    # 标题：首页字号最大的连续文本行
+    title_size = max(size for size, _ in lines)
+    start = next(i for i, (size, _) in enumerate(lines) if size >= title_size - 0.5)
+    end = start
+    while end < len(lines) and lines[end][0] >= title_size - 0.5:
+        end += 1
+    hints = {"title": " ".join(text for _, text in lines[start:end])}
+
+    # 作者：紧随标题、字号相同的连续文本行（更小字号的单位信息和摘要不计入）
+    authors = []
+    if end < len(lines):
+        author_size = lines[end][0]
+        for size, text in lines[end:end + MAX_AUTHOR_LINES]:
+            if abs(size - author_size) > 0.5 or ABSTRACT_HEADING_PATTERN.match(text):
+                break
+            authors.append(text)
+    if authors:
+        hints["authors"] = " ".join(authors)
+
+    return hints
+
+
+class PdfExtractor(abc.ABC):
+    """PDF文本提取后端基类"""
+
+    name = ""
+
+    @abc.abstractmethod
+    def available(self) -> bool:
+        """后端依赖是否已安装"""
+
+    @abc.abstractmethod
+    def extract(self, file_path: str, max_pages: int) -> Tuple[List[str], List[Tuple[float, str]]]:
+        """提取前 max_pages 页文本，返回各页文本和首页的（字号, 文本行）列表"""
+
+
+class PyMuPdfExtractor(PdfExtractor):
+    """PyMuPDF后端（最快，支持版面信息）"""
+
+    name = "pymupdf"
+
+    def available(self) -> bool:
+        return pymupdf is not None
+
+    def extract(self, file_path: str, max_pages: int) -> Tuple[List[str], List[Tuple[float, str]]]:
+        pages, lines = [], []
+        with pymupdf.open(file_path) as doc:
+            page_count = min(doc.page_count, max_pages) if max_pages > 0 else doc.page_count
+            for i in range(page_count):
+                page = doc[i]
+                pages.append(page.get_text())
+                if i == 0:
+                    for block in page.get_text("dict")["blocks"]:
+                        for line in block.get("lines", []):
+                            # 跳过旋转文本和页边文本
+                            x0, _, x1, _ = line["bbox"]
+                            if abs(line["dir"][1]) > 0.01 or in_page_margin(x0, x1, page.rect.width):
+                                continue
+                            spans = line.get("spans", [])
+                            if spans:
+                                lines.append((max(span["size"] for span in spans),
+                                              "".join(span["text"] for span in spans)))
+        return pages, lines
+
+
+class PdfiumExtractor(PdfExtractor):
+    """pypdfium2后端（速度快，随pdfplumber一起安装）"""
+
+    name = "pypdfium2"
+
+    def available(self) -> bool:
+        return pdfium is not None
+
+    def extract(self, file_path: str, max_pages: int) -> Tuple[List[str], List[Tuple[float, str]]]:
+        pages, lines = [], []
+        pdf = pdfium.PdfDocument(file_path)
+        try:
+            page_count = min(len(pdf), max_pages) if max_pages > 0 else len(pdf)
+            for i in range(page_count):
+                page = pdf[i]
+                textpage = page.get_textpage()
+                pages.append(textpage.get_text_range().replace("\r\n", "\n"))
+                if i == 0:
+                    lines = self.first_page_lines(page, textpage)
+                textpage.close()
+                page.close()
+        finally:
+            pdf.close()
+        return pages, lines
+
+    @staticmethod
+    def first_page_lines(page, textpage) -> List[Tuple[float, str]]:
+        """逐字符读取首页文本行，跳过旋转文本和页边文本"""
+        handle = textpage.raw
+        matrix = pdfium_c.FS_MATRIX()
+        rows = []  # 每行：[字号, 字符列表, 左边界, 右边界]
+        new_line = True
+        for i in range(textpage.count_chars()):
+            char = chr(pdfium_c.FPDFText_GetUnicode(handle, i))
+            if char in "\r\n":
+                new_line = True
+                continue
+
+            # 旋转文本（如arXiv侧边戳）；出错时返回-1，按水平文本处理
+            angle = pdfium_c.FPDFText_GetCharAngle(handle, i)
+            if 0.01 < angle < 2 * math.pi - 0.01:
+                continue
+
+            if new_line:
+                rows.append([0.0, [], math.inf, -math.inf])
+                new_line = False
+            row = rows[-1]
+            row[1].append(char)
+            # pdfium生成的空格没有字形框和字号，不参与统计
+            if not char.isspace():
+                left, _, right, _ = textpage.get_charbox(i)
+                # FPDFText_GetFontSize 返回 Tf 字号，需乘以文本矩阵的缩放比例得到实际字号
+                size = pdfium_c.FPDFText_GetFontSize(handle, i)
+                if pdfium_c.FPDFText_GetMatrix(handle, i, matrix):
+                    size *= math.sqrt(abs(matrix.a * matrix.d - matrix.b * matrix.c))
+                row[0] = max(row[0], size)
+                row[2] = min(row[2], left)
+                row[3] = max(row[3], right)
+
+        page_width = page.get_width()
+        return [
+            (size, "".join(chars)) for size, chars, x0, x1 in rows
+            if size > 0 and not in_page_margin(x0, x1, page_width)
+        ]
+
+
+class PdfplumberExtractor(PdfExtractor):
+    """pdfplumber后端（纯Python，较慢，作为兜底）"""
+
+    name = "pdfplumber"
+
+    def available(self) -> bool:
+        return True
+
+    def extract(self, file_path: str, max_pages: int) -> Tuple[List[str], List[Tuple[float, str]]]:
+        pages, lines = [], []
+        with pdfplumber.open(file_path) as pdf:
+            selected = pdf.pages[:max_pages] if max_pages > 0 else pdf.pages
+            for i, page in enumerate(selected):
+                pages.append(page.extract_text() or "")
+                if i == 0:
+                    # 按行位置聚合单词，行字号取最大值
+                    rows = {}
+                    for word in page.extract_words(extra_attrs=["size"]):
+                        if word["upright"]:
+                            rows.setdefault(round(word["top"]), []).append(word)
+                    for top in sorted(rows):
+                        words = rows[top]
+                        # 跳过页边文本
+                        if in_page_margin(min(word["x0"] for word in words),
+                                          max(word["x1"] for word in words), page.width):
+                            continue
+                        lines.append((max(word["size"] for word in words),
+                                      " ".join(word["text"] for word in words)))
+        return pages, lines
+
+
+# 按速度从快到慢排列，auto模式下选择第一个可用的后端
+PDF_EXTRACTORS = {
+    extractor.name: extractor
+    for extractor in (PyMuPdfExtractor(), PdfiumExtractor(), PdfplumberExtractor())
+}
+
+
+def get_pdf_extractor(backend: str = PDF_BACKEND) -> PdfExtractor:
+    """获取PDF解析后端"""
+    if backend == "auto":
+        return next(extractor for extractor in PDF_EXTRACTORS.values() if extractor.available())
+    extractor = PDF_EXTRACTORS.get(backend)
+    if extractor is None:
+        raise ValueError(f"不支持的PDF解析后端: {backend}")
+    if not extractor.available():
+        raise ValueError(f"PDF解析后端未安装: {backend}")
+    return extractor
+
 
 class LiteratureAnalyzer:
     """文献分析器类"""
 
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, cassette: Optional[ApiCassette] = None,
+                 store: Optional[SharedStore] = None, pdf_extractor: Optional[PdfExtractor] = None,
+                 max_pages: int = PDF_MAX_PAGES):
         self.api_key = api_key
+        self.cassette = cassette if cassette is not None else api_cassette
+        self.store = store if store is not None else shared_store
+        self.pdf_extractor = pdf_extractor
+        self.max_pages = max_pages
+        # 最近一次提取的PDF版面信息（标题、作者）
+        self.layout_hints: Dict[str, str] = {}
+        # 最近一次分析的内容哈希，以及结果是否为成功解析的JSON
+        self.analysis_key: Optional[str] = None
+        self.analysis_parsed = False
         self.headers = {
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json"
         }
 
     def extract_text_from_file(self, file_path: str) -> str:
-        """从文件提取文本"""
+        """从文件提取文本，PDF的版面信息保存在 layout_hints 中"""
         text = ""
         file_extension = os.path.splitext(file_path)[1].lower()
+        cache_key = None
+        self.layout_hints = {}
 
         try:
+            extractor = None
             if file_extension == '.pdf':
-                with pdfplumber.open(file_path) as pdf:
-                    for page in pdf.pages:
-                        text += page.extract_text() + "\n"
+                extractor = self.pdf_extractor or get_pdf_extractor()
+
+            # 相同内容的文件直接使用缓存文本
+            if self.store.cache_enabled:
+                with open(file_path, 'rb') as f:
+                    cache_key = f"{file_extension}:{hashlib.sha256(f.read()).hexdigest()}"
+                if extractor is not None:
+                    cache_key += f":{extractor.name}:{self.max_pages}"
+                cached_text = self.store.get_cache("text", cache_key)
+                if cached_text is not None:
+                    cached_hints = self.store.get_cache("layout", cache_key)
+                    self.layout_hints = json.loads(cached_hints) if cached_hints else {}
+                    return cached_text
+
+            if file_extension == '.pdf':
+                text, self.layout_hints = self.extract_text_from_pdf(file_path, extractor)
             elif file_extension == '.txt':
                 with open(file_path, 'r', encoding='utf-8') as f:
                     text = f.read()
@@ -63,8 +648,29 @@ class LiteratureAnalyzer:
         except Exception as e:
             raise Exception(f"文件读取失败: {str(e)}")
 
+        if cache_key and text.strip():
+            # 先写版面信息，保证读到文本缓存时版面信息已就绪
+            if self.layout_hints:
+                self.store.set_cache("layout", cache_key, json.dumps(self.layout_hints, ensure_ascii=False))
+            self.store.set_cache("text", cache_key, text)
+
         return text
 
+    def extract_text_from_pdf(self, file_path: str,
+                              extractor: Optional[PdfExtractor] = None) -> Tuple[str, Dict[str, str]]:
+        """提取PDF前N页文本，返回文本和版面识别出的标题、作者"""
+        extractor = extractor or self.pdf_extractor or get_pdf_extractor()
+        try:
+            pages, first_page_lines = extractor.extract(file_path, self.max_pages)
+        except Exception:
+            # 自动选择的后端无法解析该文件时，使用pdfplumber重试；显式指定的后端直接报错
+            if self.pdf_extractor is not None or PDF_BACKEND != "auto" or extractor.name == "pdfplumber":
+                raise
+            pages, first_page_lines = PDF_EXTRACTORS["pdfplumber"].extract(file_path, self.max_pages)
+
+        text = "".join(page + "\n" for page in pages)
+        return text, detect_title_block(first_page_lines)
+
     def extract_abstract(self, text: str, max_length: int = MAX_ABSTRACT_LENGTH) -> str:
         """从文本中提取摘要部分"""
         # 尝试寻找摘要部分
@@ -109,12 +715,19 @@ class LiteratureAnalyzer:
         }
 
         try:
-            response = requests.post(
-                DEEPSEEK_API_URL,
-                headers=self.headers,
-                json=payload,
-                timeout=30
-            )
+            if self.cassette.mode == "replay":
+                response = self.cassette.replay(payload)
+            else:
+                start_time = time.perf_counter()
+                response = requests.post(
+                    DEEPSEEK_API_URL,
+                    headers=self.headers,
+                    json=payload,
+                    timeout=30
+                )
+                if self.cassette.mode == "record":
+                    self.cassette.record(payload, response.status_code, response.text,
+                                         time.perf_counter() - start_time)
 
             if response.status_code == 200:
                 result = response.json()
@@ -131,11 +744,27 @@ class LiteratureAnalyzer:
         except Exception as e:
             raise Exception(f"API调用错误: {str(e)}")
 
-    def analyze_literature(self, text: str, file_name: str) -> Dict:
+    def analyze_literature(self, text: str, file_name: str,
+                           layout_hints: Optional[Dict[str, str]] = None) -> Dict:
         """分析文献内容"""
         # 提取摘要
         abstract = self.extract_abstract(text)
 
+        # 版面识别的标题和作者
+        layout_info = ""
+        if layout_hints and layout_hints.get("title"):
+            layout_info = f"标题（版面识别）：{layout_hints['title']}\n"
+            if layout_hints.get("authors"):
+                layout_info += f"作者（版面识别）：{layout_hints['authors']}\n"
+
+        # 相同文献和摘要直接使用缓存的分析结果
+        cache_key = hashlib.sha256(f"{file_name}\n{layout_info}{abstract}".encode('utf-8')).hexdigest()
+        self.analysis_key = cache_key
+        cached_result = self.store.get_cache("analysis", cache_key)
+        if cached_result is not None:
+            self.analysis_parsed = True
+            return json.loads(cached_result)
+
         # 系统提示词
         system_prompt = """你是一个专业的科研文献分析专家。请以结构化的方式分析科研文献，提供以下内容：
         1. 文献的基本信息（标题、作者、发表年份等）
@@ -151,7 +780,7 @@ class LiteratureAnalyzer:
         prompt = f"""请分析以下科研文献的摘要部分：
 
 文献名称：{file_name}
-摘要内容：{abstract}
+{layout_info}摘要内容：{abstract}
 
 请提供详细的分析报告，包括：
 1. 文献基本信息
@@ -183,7 +812,9 @@ class LiteratureAnalyzer:
             if json_match:
                 json_str = json_match.group()
                 analysis_result = json.loads(json_str)
+                parsed = True
             else:
+                parsed = False
                 # 如果没有找到JSON，创建默认结构
                 analysis_result = {
                     "basic_info": {"title": file_name, "authors": "未知", "year": "未知", "journal": "未知"},
@@ -196,6 +827,7 @@ class LiteratureAnalyzer:
                     "summary": response[:300] + "..." if len(response) > 300 else response
                 }
         except json.JSONDecodeError:
+            parsed = False
             # 如果JSON解析失败，创建默认结构
             analysis_result = {
                 "basic_info": {"title": file_name, "authors": "未知", "year": "未知", "journal": "未知"},
@@ -211,9 +843,14 @@ class LiteratureAnalyzer:
         # 添加摘要到结果中
         analysis_result["abstract"] = abstract
 
+        # 只缓存成功解析的结果
+        self.analysis_parsed = parsed
+        if parsed:
+            self.store.set_cache("analysis", cache_key, json.dumps(analysis_result, ensure_ascii=False))
+
         return analysis_result
 
-    def create_visualizations(self, analysis_result: Dict) -> Dict:
+    def create_visualizations(self, analysis_result: Dict, quality_scores: Optional[pd.Series] = None) -> Dict:
         """创建可视化图表"""
         vis_data = {}
 
@@ -316,27 +953,24 @@ class LiteratureAnalyzer:
 
         # 4. 综合分析雷达图
         if innovations and limitations and improvements:
-            categories = ['创新性', '完整性', '可行性', '影响力', '实用性']
-
-            # 简单评分逻辑（实际应用中可根据具体分析调整）
-            innovation_score = min(len(innovations) * 20, 100)
-            limitation_score = max(100 - len(limitations) * 15, 20)
-            improvement_score = min(len(improvements) * 25, 100)
-
-            scores = [
-                innovation_score,  # 创新性
-                max(70, limitation_score),  # 完整性
-                improvement_score,  # 可行性
-                innovation_score * 0.7 + improvement_score * 0.3,  # 影响力
-                improvement_score * 0.8 + innovation_score * 0.2,  # 实用性
-            ]
+            # 未加入语料库时仅基于当前文献评分，不显示语料库百分位
+            if quality_scores is None:
+                scores = [float(score_analyses([analysis_result]).iloc[0][metric]) for metric in QUALITY_METRICS]
+                hover = dict(hovertemplate='%{theta}: %{r:.1f}<extra></extra>')
+            else:
+                scores = [float(quality_scores[metric]) for metric in QUALITY_METRICS]
+                hover = dict(
+                    customdata=[float(quality_scores[f"{metric}百分位"]) for metric in QUALITY_METRICS],
+                    hovertemplate='%{theta}: %{r:.1f}<br>语料库百分位: %{customdata:.0f}%<extra></extra>'
+                )
 
             fig3 = go.Figure(data=go.Scatterpolar(
                 r=scores,
-                theta=categories,
+                theta=QUALITY_METRICS,
                 fill='toself',
                 line_color='#2E86AB',
-                fillcolor='rgba(46, 134, 171, 0.3)'
+                fillcolor='rgba(46, 134, 171, 0.3)',
+                **hover
             ))
 
             fig3.update_layout(
@@ -427,15 +1061,19 @@ class LiteratureAnalyzer:
         return report
 
 
+# analyze_document 除状态外的输出数量
+NUM_RESULT_OUTPUTS = 12
+
+
 def analyze_document(api_key, file_obj, use_custom_prompt, custom_prompt):
     """分析文档的主函数"""
     # 检查API密钥
     if not api_key or api_key == "your-api-key-here":
-        return "请提供有效的API密钥", None, None, None, None, None, None
+        return ("请提供有效的API密钥",) + (None,) * NUM_RESULT_OUTPUTS
 
     # 保存上传的文件
     if file_obj is None:
-        return "请上传文献文件", None, None, None, None, None, None
+        return ("请上传文献文件",) + (None,) * NUM_RESULT_OUTPUTS
 
     file_path = file_obj.name
     file_name = os.path.basename(file_path)
@@ -448,13 +1086,23 @@ def analyze_document(api_key, file_obj, use_custom_prompt, custom_prompt):
         text = analyzer.extract_text_from_file(file_path)
 
         if not text.strip():
-            return "无法从文件中提取文本，请检查文件格式", None, None, None, None, None, None
+            return ("无法从文件中提取文本，请检查文件格式",) + (None,) * NUM_RESULT_OUTPUTS
 
         # 分析文献
-        analysis_result = analyzer.analyze_literature(text, file_name)
+        analysis_result = analyzer.analyze_literature(text, file_name, analyzer.layout_hints)
+
+        # 加入语料库并批量计算质量评分（未能解析的结果只做单篇评分）
+        quality_scores = None
+        if analyzer.analysis_parsed:
+            corpus_index = analysis_store.add(analyzer.analysis_key, analysis_result)
+            corpus_scores = analysis_store.scores()
+            quality_scores = corpus_scores.iloc[corpus_index]
+        else:
+            corpus_scores = analysis_store.scores()
+        leaderboard = build_leaderboard(corpus_scores)
 
         # 创建可视化
-        visualizations = analyzer.create_visualizations(analysis_result)
+        visualizations = analyzer.create_visualizations(analysis_result, quality_scores)
 
         # 生成报告
         report = analyzer.generate_report(analysis_result, visualizations, file_name)
@@ -493,12 +1141,13 @@ def analyze_document(api_key, file_obj, use_custom_prompt, custom_prompt):
             bar_chart,
             field_pie,
             radar_chart,
-            keyword_simple_hbar
+            keyword_simple_hbar,
+            leaderboard
         )
 
     except Exception as e:
         error_msg = f"分析过程中出现错误: {str(e)}"
-        return error_msg, None, None, None, None, None, None, None, None, None, None
+        return (error_msg,) + (None,) * NUM_RESULT_OUTPUTS
 
 
 def save_report(report_text):
@@ -519,6 +1168,11 @@ def save_report(report_text):
         return f"保存报告失败: {str(e)}"
 
 
+def load_leaderboard():
+    """加载语料库排行榜"""
+    return build_leaderboard(analysis_store.scores())
+
+
 def create_demo():
     """创建Gradio界面"""
 
@@ -649,6 +1303,16 @@ def create_demo():
                                 gr.Markdown("### 关键词重要性")
                                 keyword_simple_hbar = gr.Plot(label="水平图")
 
+                    with gr.TabItem("🏆 文献排行"):
+                        gr.Markdown("### 语料库综合评分排行")
+                        leaderboard = gr.Dataframe(label="排行榜", interactive=False)
+                        refresh_btn = gr.Button("刷新排行", variant="secondary")
+
+                        refresh_btn.click(
+                            fn=load_leaderboard,
+                            outputs=leaderboard
+                        )
+
                     with gr.TabItem("📝 分析结果"):
                         gr.Markdown("### 文献基本信息")
                         basic_info = gr.Textbox(label="基本信息", lines=3, interactive=False)
@@ -698,11 +1362,14 @@ def create_demo():
                 bar_chart,
                 field_pie,
                 radar_chart,
-                keyword_simple_hbar
-
+                keyword_simple_hbar,
+                leaderboard
             ]
         )
 
+        # 启动时加载历史排行
+        demo.load(fn=load_leaderboard, outputs=leaderboard)
+
         # 示例和说明
         with gr.Accordion("使用说明", open=False):
             gr.Markdown("""
@@ -716,6 +1383,7 @@ def create_demo():
             - **智能摘要提取**：自动从文献中提取摘要部分（500字以内）
             - **结构化分析**：分析文献框架、创新点、不足和改进方向
             - **数据可视化**：生成柱状图、饼状图、雷达图等可视化图表
+            - **文献排行**：基于全部历史分析结果批量评分，给出百分位排名和排行榜
             - **报告生成**：生成完整的分析报告，支持保存为Markdown格式
 
             ### 注意事项：
@@ -727,15 +1395,70 @@ def create_demo():
     return demo
 
 
-# 主程序
-if __name__ == "__main__":
+def run_worker(port: int):
+    """启动单个应用进程"""
     # 创建Gradio应用
     demo = create_demo()
 
     # 启动应用
     demo.launch(
-        server_name="127.0.0.1",
-        server_port=7863,
+        server_name=SERVER_NAME,
+        server_port=port,
         share=False,  # 设置为True可生成公共链接
         debug=False
-    )
\ No newline at end of file
+    )
+
+
+def run_workers(count: int, port: int) -> int:
+    """启动并监管多个应用进程：任一进程退出或收到终止信号时关闭全部进程，返回退出码"""
+    workers = [
+        multiprocessing.Process(target=run_worker, args=(port + i,), name=f"worker-{port + i}")
+        for i in range(count)
+    ]
+    for worker in workers:
+        worker.start()
+
+    # SIGTERM（如进程管理器停止服务）与Ctrl-C同样处理
+    def handle_sigterm(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, handle_sigterm)
+
+    exit_code = 0
+    try:
+        # 任一进程退出（如端口被占用）都视为部署失败
+        exited = multiprocessing.connection.wait([worker.sentinel for worker in workers])
+        failed = next(worker for worker in workers if worker.sentinel in exited)
+        failed.join()
+        print(f"{failed.name} 已退出（退出码 {failed.exitcode}），正在关闭其他进程")
+        exit_code = failed.exitcode or 1
+    except KeyboardInterrupt:
+        print("收到终止信号，正在关闭全部进程")
+    finally:
+        # 清理期间忽略重复的终止信号，保证所有进程都被终止
+        signal.signal(signal.SIGTERM, signal.SIG_IGN)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        for worker in workers:
+            if worker.is_alive():
+                worker.terminate()
+        for worker in workers:
+            worker.join(timeout=10)
+            if worker.is_alive():
+                worker.kill()
+                worker.join()
+
+    return exit_code
+
+
+# 主程序
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="科研文献分析助手")
+    parser.add_argument("--workers", type=int, default=1, help="应用进程数量，每个进程使用独立端口")
+    parser.add_argument("--port", type=int, default=SERVER_PORT, help="起始端口，第i个进程使用 port+i")
+    args = parser.parse_args()
+
+    if args.workers <= 1:
+        run_worker(args.port)
+    else:
+        # 多进程部署：各进程共享SQLite存储，前端需配置会话保持的反向代理
+        sys.exit(run_workers(args.workers, args.port))
\ No newline at end of file
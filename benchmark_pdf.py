@@ -0,0 +1,70 @@
+# PDF解析后端基准测试：比较各后端在样本文献上的解析耗时和版面识别效果
+#
+# 用法：
+#   python benchmark_pdf.py samples/ --pages 2 --repeat 3
+import argparse
+import os
+import time
+
+import pdfplumber
+
+from analysis import PDF_EXTRACTORS, detect_title_block
+
+
+def run_original(files, repeat):
+    """原有实现：pdfplumber逐页 extract_text() 解析全部页面，返回平均每篇耗时（毫秒）"""
+    start_time = time.perf_counter()
+    for _ in range(repeat):
+        for file_path in files:
+            with pdfplumber.open(file_path) as pdf:
+                for page in pdf.pages:
+                    page.extract_text()
+    elapsed = time.perf_counter() - start_time
+    return elapsed * 1000 / (len(files) * repeat)
+
+
+def run_backend(extractor, files, max_pages, repeat):
+    """返回平均每篇耗时（毫秒）和识别出标题的文献数"""
+    titles = 0
+    start_time = time.perf_counter()
+    for _ in range(repeat):
+        for file_path in files:
+            _, lines = extractor.extract(file_path, max_pages)
+            if detect_title_block(lines).get("title"):
+                titles += 1
+    elapsed = time.perf_counter() - start_time
+    return elapsed * 1000 / (len(files) * repeat), titles // repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF解析后端基准测试")
+    parser.add_argument("corpus", help="样本PDF目录")
+    parser.add_argument("--pages", type=int, default=2, help="快速路径解析的页数")
+    parser.add_argument("--repeat", type=int, default=3, help="重复次数")
+    args = parser.parse_args()
+
+    files = sorted(
+        os.path.join(args.corpus, name) for name in os.listdir(args.corpus)
+        if name.lower().endswith('.pdf')
+    )
+    if not files:
+        raise SystemExit(f"目录中没有PDF文件: {args.corpus}")
+
+    # 基准：原有的pdfplumber全文解析
+    baseline = run_original(files, args.repeat)
+
+    print(f"PDF数: {len(files)}，基准（pdfplumber全部页面）: {baseline:.1f} ms/篇")
+    print(f"{'后端':<12} {'页数':>6} {'耗时(ms/篇)':>12} {'加速比':>8} {'识别标题':>8}")
+    for name, extractor in PDF_EXTRACTORS.items():
+        if not extractor.available():
+            print(f"{name:<12} 未安装")
+            continue
+        for max_pages in (0, args.pages):
+            per_file, titles = run_backend(extractor, files, max_pages, args.repeat)
+            pages_label = "全部" if max_pages == 0 else str(max_pages)
+            print(f"{name:<12} {pages_label:>6} {per_file:>12.1f} {baseline / per_file:>8.1f} "
+                  f"{titles:>5}/{len(files)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# 多进程压测脚本：离线回放API响应，测量文献分析吞吐量随进程数的变化
+#
+# 只测量进程内的分析流水线（analyze_document：文本提取、API回放、语料库写入与评分、
+# 可视化和报告生成）在多进程下的扩展性，不经过 `python analysis.py --workers N` 的
+# HTTP接口和反向代理。每轮使用新的共享数据库，并预置固定规模的语料库，
+# 保证各轮的评分开销一致。
+#
+# 用法：
+#   1. 录制API响应（需要有效的API密钥，每篇文献调用一次API）
+#      python load_test.py samples/ --record --api-key sk-xxx
+#   2. 离线压测（不访问网络）
+#      python load_test.py samples/ --workers 1 2 4 8 --repeat 5
+import argparse
+import os
+import random
+import tempfile
+import time
+from multiprocessing import Pool
+from types import SimpleNamespace
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.txt', '.docx', '.doc')
+
+
+def init_worker(db_path):
+    """工作进程使用本轮的共享数据库"""
+    import analysis
+
+    analysis.shared_store = analysis.SharedStore(db_path, analysis.CACHE_ENABLED)
+    analysis.analysis_store = analysis.AnalysisStore(analysis.shared_store)
+
+
+def seed_corpus(db_path, size):
+    """预置固定规模的合成语料库"""
+    import analysis
+
+    store = analysis.SharedStore(db_path)
+    rng = random.Random(0)
+    for i in range(size):
+        store.upsert_analysis(f"seed-{i}", {
+            "basic_info": {"title": f"seed-{i}"},
+            "innovations": ["-"] * rng.randint(1, 5),
+            "limitations": ["-"] * rng.randint(1, 5),
+            "improvements": ["-"] * rng.randint(1, 5),
+            "fields": [],
+            "keywords": [f"kw{rng.randint(0, size)}" for _ in range(5)],
+        })
+
+
+def analyze_file(task):
+    """在工作进程中分析单篇文献，返回耗时和是否成功"""
+    import analysis
+
+    api_key, file_path = task
+    start_time = time.perf_counter()
+    status = analysis.analyze_document(api_key, SimpleNamespace(name=file_path), False, "")[0]
+    return time.perf_counter() - start_time, status == "分析完成！"
+
+
+def run(args, work_dir):
+    """录制API响应，或按不同进程数依次压测"""
+    files = sorted(
+        os.path.join(args.corpus, name) for name in os.listdir(args.corpus)
+        if name.lower().endswith(SUPPORTED_EXTENSIONS)
+    )
+    if not files:
+        raise SystemExit(f"目录中没有可分析的文献: {args.corpus}")
+
+    if args.record:
+        for file_path in files:
+            elapsed, ok = analyze_file((args.api_key, file_path))
+            print(f"{'已录制' if ok else '失败'} {os.path.basename(file_path)} ({elapsed:.2f}s)")
+        return
+
+    tasks = [(args.api_key, file_path) for file_path in files] * args.repeat
+    worker_counts = sorted(set(args.workers) | {1})
+    baseline = None
+
+    print("测量范围：进程内 analyze_document 流水线（不含HTTP接口）")
+    print(f"文献数: {len(files)}，每轮任务数: {len(tasks)}，预置语料库: {args.corpus_size}")
+    print(f"{'进程数':>6} {'耗时(s)':>10} {'吞吐量(篇/s)':>14} {'加速比':>8} {'效率':>8} {'失败数':>6}")
+    for workers in worker_counts:
+        db_path = os.path.join(work_dir, f"round-{workers}.db")
+        seed_corpus(db_path, args.corpus_size)
+
+        with Pool(workers, initializer=init_worker, initargs=(db_path,)) as pool:
+            start_time = time.perf_counter()
+            results = pool.map(analyze_file, tasks)
+            wall_time = time.perf_counter() - start_time
+
+        throughput = len(tasks) / wall_time
+        if baseline is None:
+            baseline = throughput
+        speedup = throughput / baseline
+        failures = sum(1 for _, ok in results if not ok)
+        print(f"{workers:>6} {wall_time:>10.2f} {throughput:>14.2f} {speedup:>8.2f} "
+              f"{speedup / workers:>8.0%} {failures:>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="科研文献分析助手压测（进程内分析流水线）")
+    parser.add_argument("corpus", help="样本文献目录")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1],
+                        help="要测试的进程数（始终包含1作为加速比基准）")
+    parser.add_argument("--repeat", type=int, default=3, help="每篇文献重复分析次数")
+    parser.add_argument("--corpus-size", type=int, default=1000, help="每轮预置的语料库规模")
+    parser.add_argument("--cassette", default="deepseek_cassette.jsonl", help="API录制文件")
+    parser.add_argument("--record", action="store_true", help="录制模式：调用真实API并保存响应")
+    parser.add_argument("--api-key", default="offline", help="录制模式下使用的API密钥")
+    parser.add_argument("--cache", action="store_true", help="启用文本和分析结果缓存")
+    parser.add_argument("--latency", action="store_true", help="回放时模拟录制的API延迟")
+    args = parser.parse_args()
+
+    # 必须在导入 analysis 之前设置环境变量
+    os.environ["DEEPSEEK_CASSETTE_MODE"] = "record" if args.record else "replay"
+    os.environ["DEEPSEEK_CASSETTE_PATH"] = args.cassette
+    os.environ["DEEPSEEK_CASSETTE_LATENCY"] = "1" if args.latency else "0"
+    os.environ["PAPER_AGENT_CACHE"] = "1" if args.cache else "0"
+
+    # 录制和各轮压测的数据库都放在临时目录中，结束后自动删除
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.environ["PAPER_AGENT_DB"] = os.path.join(work_dir, "record.db")
+        run(args, work_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+import os
+import sys
+import tempfile
+
+# 导入 analysis 之前配置环境：默认数据库放在临时目录，关闭录制/回放，PDF后端自动选择
+os.environ.setdefault("GRADIO_ANALYTICS_ENABLED", "False")
+os.environ["PAPER_AGENT_DB"] = os.path.join(tempfile.mkdtemp(), "test.db")
+os.environ["DEEPSEEK_CASSETTE_MODE"] = ""
+os.environ["PAPER_AGENT_PDF_BACKEND"] = "auto"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,91 @@
+import json
+
+import pytest
+
+import analysis
+from analysis import ApiCassette, LiteratureAnalyzer, SharedStore
+
+PAYLOAD = {"model": "deepseek-chat", "messages": [{"role": "user", "content": "你好"}]}
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, content):
+        self.text = json.dumps({"choices": [{"message": {"content": content}}]}, ensure_ascii=False)
+
+    def json(self):
+        return json.loads(self.text)
+
+
+def test_fingerprint_ignores_key_order():
+    reordered = {"messages": PAYLOAD["messages"], "model": "deepseek-chat"}
+    assert ApiCassette.fingerprint(PAYLOAD) == ApiCassette.fingerprint(reordered)
+    assert ApiCassette.fingerprint(PAYLOAD) != ApiCassette.fingerprint({**PAYLOAD, "model": "x"})
+
+
+def test_invalid_mode():
+    with pytest.raises(ValueError):
+        ApiCassette(mode="live")
+
+
+def test_record_does_not_duplicate_entries(tmp_path):
+    cassette = ApiCassette(str(tmp_path / "c.jsonl"), mode="record")
+    cassette.record(PAYLOAD, 200, '{"a": 1}', 0.1)
+    assert len(cassette._load()[ApiCassette.fingerprint(PAYLOAD)]) == 1
+    assert len((tmp_path / "c.jsonl").read_text(encoding="utf-8").splitlines()) == 1
+
+
+def test_replay_order_cycles(tmp_path):
+    path = str(tmp_path / "c.jsonl")
+    recorder = ApiCassette(path, mode="record")
+    recorder.record(PAYLOAD, 200, '{"a": 1}', 0.0)
+    recorder.record(PAYLOAD, 500, '{"a": 2}', 0.0)
+
+    player = ApiCassette(path, mode="replay")
+    responses = [player.replay(PAYLOAD) for _ in range(3)]
+    assert [r.status_code for r in responses] == [200, 500, 200]
+    assert [r.json()["a"] for r in responses] == [1, 2, 1]
+
+
+def test_replay_unknown_request(tmp_path):
+    player = ApiCassette(str(tmp_path / "missing.jsonl"), mode="replay")
+    with pytest.raises(Exception, match="未找到"):
+        player.replay(PAYLOAD)
+
+
+def test_replay_latency(tmp_path, monkeypatch):
+    path = str(tmp_path / "c.jsonl")
+    ApiCassette(path, mode="record").record(PAYLOAD, 200, "{}", 1.5)
+    sleeps = []
+    monkeypatch.setattr(analysis.time, "sleep", sleeps.append)
+    ApiCassette(path, mode="replay", replay_latency=True).replay(PAYLOAD)
+    assert sleeps == [1.5]
+
+
+def test_record_then_replay_analysis(tmp_path, monkeypatch):
+    path = str(tmp_path / "c.jsonl")
+    result = {"basic_info": {"title": "T"}, "innovations": ["a"], "keywords": ["k"]}
+    calls = []
+
+    def fake_post(url, headers=None, json=None, timeout=None):
+        calls.append(json)
+        return FakeResponse(analysis.json.dumps(result, ensure_ascii=False))
+
+    monkeypatch.setattr(analysis.requests, "post", fake_post)
+    text = "摘要：我们研究X。\n关键词：X\n"
+
+    store = SharedStore(str(tmp_path / "record.db"), cache_enabled=False)
+    recorder = LiteratureAnalyzer("sk-test", ApiCassette(path, mode="record"), store)
+    recorded = recorder.analyze_literature(text, "paper.txt")
+
+    # 回放时不访问网络
+    monkeypatch.setattr(analysis.requests, "post", None)
+    store = SharedStore(str(tmp_path / "replay.db"), cache_enabled=False)
+    player = LiteratureAnalyzer("sk-other", ApiCassette(path, mode="replay"), store)
+    replayed = player.analyze_literature(text, "paper.txt")
+
+    assert len(calls) == 1
+    assert replayed == recorded
+    assert replayed["basic_info"]["title"] == "T"
+    assert player.analysis_parsed
@@ -0,0 +1,182 @@
+import pytest
+
+import analysis
+from analysis import LiteratureAnalyzer, PdfExtractor, SharedStore, detect_title_block, in_page_margin
+
+
+class FakeExtractor(PdfExtractor):
+    def __init__(self, name, text="正文", lines=(), error=None):
+        self.name = name
+        self.text = text
+        self.lines = list(lines)
+        self.error = error
+        self.calls = 0
+
+    def available(self) -> bool:
+        return True
+
+    def extract(self, file_path, max_pages):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return [self.text], self.lines
+
+
+def write_pdf(path, content):
+    """写入只有一页、使用Helvetica字体的最小PDF"""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        b"/Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    data = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(data))
+        data += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(data)
+    data += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    data += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    data += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    path.write_bytes(data)
+    return str(path)
+
+
+@pytest.fixture
+def pdf_file(tmp_path):
+    path = tmp_path / "paper.pdf"
+    path.write_bytes(b"%PDF-1.4 fake")
+    return str(path)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SharedStore(str(tmp_path / "s.db"))
+
+
+def test_title_and_authors():
+    lines = [(17, "Real Title"), (12, "Alice, Bob"), (10, "Tsinghua University"), (10, "Abstract")]
+    assert detect_title_block(lines) == {"title": "Real Title", "authors": "Alice, Bob"}
+
+
+def test_arxiv_stamp_is_not_title():
+    lines = [(20, "arXiv:2401.12345v1 [cs.CL] 10 Jan 2024"), (17, "Real Title"), (12, "Alice, Bob"), (10, "Abstract")]
+    assert detect_title_block(lines) == {"title": "Real Title", "authors": "Alice, Bob"}
+
+
+def test_multiline_title_and_header_lines():
+    lines = [
+        (9, "Journal of Testing, Vol. 3"),
+        (18, "A Long Title"),
+        (18, "Spanning Two Lines"),
+        (11, "Alice"),
+        (11, "Bob"),
+        (11, "Carol"),
+        (11, "Dave"),
+    ]
+    hints = detect_title_block(lines)
+    assert hints["title"] == "A Long Title Spanning Two Lines"
+    assert hints["authors"] == "Alice Bob Carol"
+
+
+def test_no_authors_before_abstract():
+    assert detect_title_block([(17, "Title"), (10, "摘要：本文研究")]) == {"title": "Title"}
+    assert detect_title_block([]) == {}
+    assert detect_title_block([(10, "  "), (20, "https://example.com")]) == {}
+
+
+def test_in_page_margin():
+    assert in_page_margin(10, 35, 612)
+    assert in_page_margin(580, 600, 612)
+    assert not in_page_margin(10, 300, 612)
+
+
+def test_txt_header_is_not_layout_hints(tmp_path, store):
+    path = tmp_path / "paper.txt"
+    path.write_text("标题：关于X的研究\n\n正文", encoding="utf-8")
+    analyzer = LiteratureAnalyzer("sk-test", store=store)
+    assert analyzer.extract_text_from_file(str(path)) == "标题：关于X的研究\n\n正文"
+    assert analyzer.layout_hints == {}
+
+
+def test_pdf_hints_returned_separately_and_cached(pdf_file, store):
+    extractor = FakeExtractor("fake", lines=[(17, "Title"), (12, "Alice")])
+    analyzer = LiteratureAnalyzer("sk-test", store=store, pdf_extractor=extractor)
+
+    assert analyzer.extract_text_from_file(pdf_file) == "正文\n"
+    assert analyzer.layout_hints == {"title": "Title", "authors": "Alice"}
+
+    analyzer.layout_hints = {}
+    assert analyzer.extract_text_from_file(pdf_file) == "正文\n"
+    assert analyzer.layout_hints == {"title": "Title", "authors": "Alice"}
+    assert extractor.calls == 1
+
+
+def test_cache_key_includes_backend(pdf_file, store):
+    first = LiteratureAnalyzer("sk-test", store=store, pdf_extractor=FakeExtractor("one", text="A"))
+    second = LiteratureAnalyzer("sk-test", store=store, pdf_extractor=FakeExtractor("two", text="B"))
+    assert first.extract_text_from_file(pdf_file) == "A\n"
+    assert second.extract_text_from_file(pdf_file) == "B\n"
+
+
+def test_extractor_must_implement_interface():
+    class Incomplete(PdfExtractor):
+        name = "incomplete"
+
+        def available(self) -> bool:
+            return True
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_auto_without_pymupdf_detects_layout(tmp_path, store, monkeypatch):
+    pytest.importorskip("pypdfium2")
+    monkeypatch.setattr(analysis, "pymupdf", None)
+    path = write_pdf(tmp_path / "paper.pdf", (
+        # 旋转的arXiv侧边戳、通过文本矩阵放大的标题、作者、单位和摘要
+        b"BT /F1 20 Tf 0 1 -1 0 30 300 Tm (arXiv:2401.12345v1 [cs.CL]) Tj ET "
+        b"BT /F1 1 Tf 18 0 0 18 72 700 Tm (Matrix Scaled Title) Tj ET "
+        b"BT /F1 12 Tf 72 670 Td (Alice Zhang, Bob Li) Tj ET "
+        b"BT /F1 9 Tf 72 650 Td (Tsinghua University) Tj ET "
+        b"BT /F1 9 Tf 72 620 Td (Abstract: we study X.) Tj ET"
+    ))
+
+    assert analysis.get_pdf_extractor().name == "pypdfium2"
+    analyzer = LiteratureAnalyzer("sk-test", store=store)
+    assert "Matrix Scaled Title" in analyzer.extract_text_from_file(path)
+    assert analyzer.layout_hints == {"title": "Matrix Scaled Title", "authors": "Alice Zhang, Bob Li"}
+
+
+def test_auto_backend_falls_back_to_pdfplumber(pdf_file, store, monkeypatch):
+    fallback = FakeExtractor("pdfplumber", text="兜底")
+    monkeypatch.setattr(analysis, "PDF_EXTRACTORS", {
+        "pymupdf": FakeExtractor("pymupdf", error=RuntimeError("损坏的PDF")),
+        "pdfplumber": fallback,
+    })
+    analyzer = LiteratureAnalyzer("sk-test", store=store)
+    assert analyzer.extract_text_from_file(pdf_file) == "兜底\n"
+    assert fallback.calls == 1
+
+
+def test_explicit_backend_does_not_fall_back(pdf_file, store):
+    extractor = FakeExtractor("pymupdf", error=RuntimeError("损坏的PDF"))
+    analyzer = LiteratureAnalyzer("sk-test", store=store, pdf_extractor=extractor)
+    with pytest.raises(Exception, match="文件读取失败"):
+        analyzer.extract_text_from_file(pdf_file)
+
+
+def test_layout_hints_in_prompt(store, monkeypatch):
+    prompts = []
+
+    def fake_call(prompt, system_prompt=None):
+        prompts.append(prompt)
+        return "{}"
+
+    analyzer = LiteratureAnalyzer("sk-test", store=store)
+    monkeypatch.setattr(analyzer, "call_deepseek_api", fake_call)
+    analyzer.analyze_literature("摘要：本文研究X。\n关键词：X\n", "paper.pdf", {"title": "Title", "authors": "Alice"})
+    assert "标题（版面识别）：Title\n作者（版面识别）：Alice\n摘要内容：本文研究X。" in prompts[0]
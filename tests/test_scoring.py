@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from analysis import QUALITY_METRICS, build_leaderboard, score_analyses
+
+
+def make_analysis(title, innovations=3, limitations=1, improvements=2, keywords=()):
+    return {
+        "basic_info": {"title": title},
+        "innovations": ["-"] * innovations,
+        "limitations": ["-"] * limitations,
+        "improvements": ["-"] * improvements,
+        "keywords": list(keywords),
+    }
+
+
+def test_empty_corpus():
+    scores = score_analyses([])
+    assert len(scores) == 0
+    assert "综合得分百分位" in scores.columns
+
+
+def test_single_paper_matches_radar_formulas():
+    row = score_analyses([make_analysis("A", keywords=["llm"])]).iloc[0]
+    assert row["创新性"] == 60
+    assert row["完整性"] == 85
+    assert row["可行性"] == 50
+    assert row["影响力"] == pytest.approx(57)
+    assert row["实用性"] == pytest.approx(52)
+    # 单篇文献的关键词都是新的，百分位均为100
+    assert row["关键词新颖度"] == 100
+    assert row["综合得分百分位"] == 100
+
+
+def test_single_paper_without_keywords_has_zero_novelty():
+    row = score_analyses([make_analysis("A")]).iloc[0]
+    assert row["关键词新颖度"] == 0
+
+
+def test_keyword_novelty_against_corpus():
+    analyses = [
+        make_analysis("A", keywords=["LLM", "rag"]),
+        make_analysis("B", keywords=["llm ", "vision"]),
+        make_analysis("C", keywords=["audio"]),
+    ]
+    novelty = score_analyses(analyses)["关键词新颖度"].to_numpy()
+    # "llm" 在另外2篇中出现1次（不区分大小写和首尾空格）：(1 - 1/2 + 1) / 2 = 0.75
+    np.testing.assert_allclose(novelty, [75, 75, 100])
+
+
+def test_counts_tolerate_string_and_missing_fields():
+    analyses = [{"basic_info": "未知", "innovations": "一个创新点", "keywords": None}]
+    row = score_analyses(analyses).iloc[0]
+    assert row["标题"] == "未知"
+    assert row["创新性"] == 20
+    assert row["可行性"] == 0
+
+
+def test_percentiles_and_overall_score():
+    analyses = [make_analysis("low", innovations=1), make_analysis("high", innovations=5)]
+    scores = score_analyses(analyses)
+    np.testing.assert_allclose(scores["综合得分"], scores[QUALITY_METRICS].mean(axis=1))
+    assert list(scores["创新性百分位"]) == [50, 100]
+
+
+def test_leaderboard_orders_by_overall_score():
+    analyses = [make_analysis(f"P{i}", innovations=i) for i in range(5)]
+    leaderboard = build_leaderboard(score_analyses(analyses), top_n=3)
+    assert list(leaderboard["排名"]) == [1, 2, 3]
+    assert list(leaderboard["标题"]) == ["P4", "P3", "P2"]
+
+
+def test_radar_percentiles_only_with_corpus_scores():
+    from analysis import LiteratureAnalyzer
+
+    analysis_result = make_analysis("A", keywords=["llm"])
+    analyzer = LiteratureAnalyzer("sk-test")
+
+    radar = analyzer.create_visualizations(analysis_result)["radar_chart"].data[0]
+    assert radar.customdata is None
+    assert "百分位" not in radar.hovertemplate
+
+    corpus_scores = score_analyses([analysis_result, make_analysis("B")])
+    radar = analyzer.create_visualizations(analysis_result, corpus_scores.iloc[0])["radar_chart"].data[0]
+    assert list(radar.customdata) == list(corpus_scores.iloc[0][[f"{m}百分位" for m in QUALITY_METRICS]])
+    assert "语料库百分位" in radar.hovertemplate
@@ -0,0 +1,101 @@
+import multiprocessing
+
+from analysis import AnalysisStore, SharedStore
+
+
+def make_analysis(title, keywords=()):
+    return {
+        "basic_info": {"title": title},
+        "innovations": ["-"],
+        "limitations": ["-"],
+        "improvements": ["-"],
+        "keywords": list(keywords),
+        "abstract": "不写入语料库",
+    }
+
+
+def test_cache_roundtrip(tmp_path):
+    store = SharedStore(str(tmp_path / "s.db"))
+    assert store.get_cache("text", "k") is None
+    store.set_cache("text", "k", "v1")
+    store.set_cache("text", "k", "v2")
+    assert store.get_cache("text", "k") == "v2"
+    assert store.get_cache("analysis", "k") is None
+
+
+def test_cache_disabled(tmp_path):
+    store = SharedStore(str(tmp_path / "s.db"), cache_enabled=False)
+    store.set_cache("text", "k", "v")
+    assert store.get_cache("text", "k") is None
+
+
+def test_upsert_keeps_one_row_per_key(tmp_path):
+    store = SharedStore(str(tmp_path / "s.db"))
+    first = store.upsert_analysis("a", {"v": 1})
+    store.upsert_analysis("b", {"v": 2})
+    assert store.upsert_analysis("a", {"v": 3}) == first
+
+    rows = store.load_analyses()
+    assert [(row_id, record["v"]) for row_id, _, record in rows] == [(2, 2), (first, 3)]
+    # 增量读取只返回序号更大的记录
+    assert store.load_analyses(rows[-1][1]) == []
+
+
+def test_analysis_store_deduplicates(tmp_path):
+    corpus = AnalysisStore(SharedStore(str(tmp_path / "s.db")))
+    assert corpus.add("a", make_analysis("A")) == 0
+    assert corpus.add("b", make_analysis("B")) == 1
+    assert corpus.add("a", make_analysis("A2")) == 0
+
+    analyses = corpus.load()
+    assert [a["basic_info"]["title"] for a in analyses] == ["A2", "B"]
+    assert "abstract" not in analyses[0]
+    assert len(corpus.scores()) == 2
+
+
+def test_analysis_store_syncs_other_instances(tmp_path):
+    path = str(tmp_path / "s.db")
+    writer = AnalysisStore(SharedStore(path))
+    reader = AnalysisStore(SharedStore(path))
+
+    writer.add("a", make_analysis("A", ["x"]))
+    assert list(reader.scores()["标题"]) == ["A"]
+
+    # 新增和更新都会被增量同步，并使评分表失效
+    writer.add("b", make_analysis("B", ["x"]))
+    writer.add("a", make_analysis("A2", ["y"]))
+    scores = reader.scores()
+    assert list(scores["标题"]) == ["A2", "B"]
+    assert list(scores["关键词新颖度"]) == [100, 100]
+
+
+def _add_from_child(path, key):
+    AnalysisStore(SharedStore(path)).add(key, make_analysis(key))
+
+
+def test_analysis_store_across_processes(tmp_path):
+    path = str(tmp_path / "s.db")
+    corpus = AnalysisStore(SharedStore(path))
+    corpus.add("parent", make_analysis("parent"))
+
+    workers = [multiprocessing.Process(target=_add_from_child, args=(path, f"child-{i}")) for i in range(3)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+        assert worker.exitcode == 0
+
+    assert sorted(a["basic_info"]["title"] for a in corpus.load()) == ["child-0", "child-1", "child-2", "parent"]
+
+
+def test_identical_upsert_keeps_sequence(tmp_path):
+    store = SharedStore(str(tmp_path / "s.db"))
+    store.upsert_analysis("a", {"v": 1})
+    last_seq = store.load_analyses()[-1][1]
+
+    # 记录未变化（如命中分析缓存）时不更新序号，其他进程无需重新评分
+    store.upsert_analysis("a", {"v": 1})
+    assert store.load_analyses(last_seq) == []
+
+    store.upsert_analysis("a", {"v": 2})
+    assert [record["v"] for _, _, record in store.load_analyses(last_seq)] == [2]